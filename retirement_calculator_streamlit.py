@@ -6,90 +6,137 @@ by Joy Victor
 """
 
 import streamlit as st
-import pandas as pd
+import numpy as np
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
 from typing import Dict, List, Tuple
 
 # [All the same functions from before - keeping them identical]
-# RMD Table
-RMD_TABLE = {
-    73: 26.5, 74: 25.5, 75: 24.6, 76: 23.7, 77: 22.9, 78: 22.0, 79: 21.1,
-    80: 20.2, 81: 19.4, 82: 18.5, 83: 17.7, 84: 16.8, 85: 16.0, 86: 15.2,
-    87: 14.4, 88: 13.7, 89: 12.9, 90: 12.2
-}
+# IRS Uniform Lifetime Table divisors for ages 73-100, indexed by (age - 73)
+RMD_DIVISORS = np.array([
+    26.5, 25.5, 24.6, 23.7, 22.9, 22.0, 21.1, 20.2, 19.4, 18.5,
+    17.7, 16.8, 16.0, 15.2, 14.4, 13.7, 12.9, 12.2, 11.5, 10.8,
+    10.1, 9.5, 8.9, 8.4, 7.8, 7.3, 6.8, 6.4
+])
+RMD_DIVISORS.setflags(write=False)
+
+# Medicare IRMAA income thresholds and the annual Part B surcharge for each tier
+IRMAA_THRESHOLDS = np.array([103000, 197000, 296000, 395000, 500000], dtype=float)
+IRMAA_SURCHARGES = np.array([0.0, 69.90, 209.90, 280.50, 349.90, 419.30]) * 12
+IRMAA_THRESHOLDS.setflags(write=False)
+IRMAA_SURCHARGES.setflags(write=False)
+
+# Combined-income thresholds that set how much of Social Security is taxable
+SS_TAXABILITY_THRESHOLDS = np.array([25000.0, 34000.0])
+SS_TAXABLE_PERCENTAGES = np.array([0.0, 0.50, 0.85])
+SS_TAXABILITY_THRESHOLDS.setflags(write=False)
+SS_TAXABLE_PERCENTAGES.setflags(write=False)
+
+# Social Security claiming multipliers for the supported (claim age, FRA) pairs;
+# unlisted combinations take the full benefit
+SS_MULTIPLIERS = MappingProxyType({
+    (62, 66): 0.75, (62, 67): 0.70,
+    (65, 66): 0.933, (65, 67): 0.867,
+    (66, 66): 1.0, (67, 66): 1.0, (67, 67): 1.0,
+    (70, 66): 1.32, (70, 67): 1.24,
+})
+
+# Pension early-retirement multipliers; ages not listed take no reduction
+PENSION_MULTIPLIERS = MappingProxyType({62: 0.80, 65: 0.93})
+
+@dataclass(slots=True)
+class Projection:
+    age: int
+    projected_401k: float
+    projected_trad_ira: float
+    projected_roth_ira: float
+    projected_taxable: float
+    total_retirement_assets: float
+    projected_home_value: float
+    total_net_worth: float
+    pension: float
+    pension_multiplier: float
+    social_security: float
+    ss_multiplier: float
+    needed_withdrawal: float
+    four_percent_withdrawal: float
+    savings_vs_4pct: float
+    total_annual_income: float
+    taxes: float
+    medicare_costs: float
+    net_annual_income: float
+    net_monthly_income: float
+    monthly_retirement_expenses: float
+    annual_expenses: float
+    expense_coverage_ratio: float
+    monthly_surplus_shortfall: float
+    years_until_retirement: int
+    annual_pension: float
+    annual_ss: float
+    lifetime_savings_vs_4pct: float
 
 def calculate_account_growth(current_balance: float, years: int, contribution: float, rate: float) -> float:
-    balance = current_balance
     annual_rate = rate / 100
-    for _ in range(years):
-        balance = balance * (1 + annual_rate) + contribution
-    return balance
-
-def get_social_security_multiplier(claim_age: int, fra: int) -> float:
-    if claim_age == 62:
-        return 0.70 if fra == 67 else 0.75
-    elif claim_age == 65:
-        return 0.867 if fra == 67 else 0.933
-    elif claim_age == fra:
-        return 1.0
-    elif claim_age == 70:
-        years_delayed = 70 - fra
-        return 1.0 + (years_delayed * 0.08)
-    return 1.0
-
-def get_pension_multiplier(retirement_age: int) -> float:
-    if retirement_age == 62:
-        return 0.80
-    elif retirement_age == 65:
-        return 0.93
-    elif retirement_age >= 67:
-        return 1.0
-    return 1.0
+    if annual_rate == 0:
+        return current_balance + contribution * years
+    growth = (1 + annual_rate) ** years
+    return current_balance * growth + contribution * (growth - 1) / annual_rate
+
+def get_social_security_multipliers(claim_ages: np.ndarray, fra: int) -> np.ndarray:
+    return np.array([SS_MULTIPLIERS.get((int(age), fra), 1.0) for age in claim_ages])
+
+def get_pension_multipliers(retirement_ages: np.ndarray) -> np.ndarray:
+    return np.array([PENSION_MULTIPLIERS.get(int(age), 1.0) for age in retirement_ages])
 
 def calculate_rmd(balance: float, age: int) -> float:
     if age < 73:
         return 0
-    divisor = RMD_TABLE.get(age, 20.2)
-    return balance / divisor
+    return balance / RMD_DIVISORS[min(age, 100) - 73]
 
 def calculate_medicare_costs(age: int, gross_income: float) -> float:
     if age < 65:
         return 0
-    part_b = 174.70 * 12
-    if gross_income > 500000:
-        part_b += 419.30 * 12
-    elif gross_income > 395000:
-        part_b += 349.90 * 12
-    elif gross_income > 296000:
-        part_b += 280.50 * 12
-    elif gross_income > 197000:
-        part_b += 209.90 * 12
-    elif gross_income > 103000:
-        part_b += 69.90 * 12
+    tier = np.searchsorted(IRMAA_THRESHOLDS, gross_income, side='left')
+    part_b = 174.70 * 12 + IRMAA_SURCHARGES[tier]
     part_d = 55 * 12
     out_of_pocket = 2000
     return part_b + part_d + out_of_pocket
 
+# 2024 single-filer standard deduction, plus the extra amount at 65+
+STANDARD_DEDUCTION = 14600
+STANDARD_DEDUCTION_65_PLUS = STANDARD_DEDUCTION + 1950
+
+@lru_cache(maxsize=8)
 def get_standard_deduction(age: int) -> float:
-    standard_deduction = 14600
-    if age >= 65:
-        standard_deduction += 1950
-    return standard_deduction
+    return STANDARD_DEDUCTION_65_PLUS if age >= 65 else STANDARD_DEDUCTION
+
+# Dollar inputs to the tax cache are rounded to this bucket size; a bigger
+# bucket raises the hit rate across reruns at the cost of a few dollars of accuracy
+TAX_CACHE_TOLERANCE = 100
 
 def calculate_taxes(withdrawal_401k: float, withdrawal_trad_ira: float,
                    withdrawal_taxable: float, pension_income: float,
                    ss_income: float, age: int, federal_rate: float,
                    state_rate: float) -> Dict[str, float]:
+    tol = TAX_CACHE_TOLERANCE
+    return _calculate_taxes_cached(
+        round(withdrawal_401k / tol) * tol, round(withdrawal_trad_ira / tol) * tol,
+        round(withdrawal_taxable / tol) * tol, round(pension_income / tol) * tol,
+        round(ss_income / tol) * tol, age, federal_rate, state_rate)
+
+@lru_cache(maxsize=256)
+def _calculate_taxes_cached(withdrawal_401k: float, withdrawal_trad_ira: float,
+                           withdrawal_taxable: float, pension_income: float,
+                           ss_income: float, age: int, federal_rate: float,
+                           state_rate: float) -> Dict[str, float]:
     federal = federal_rate / 100
     state = state_rate / 100
     total_withdrawals = withdrawal_401k + withdrawal_trad_ira
     taxable_gains = withdrawal_taxable * 0.5 * 0.15
     combined_income = total_withdrawals + pension_income + (ss_income * 0.5) + (withdrawal_taxable * 0.5)
-    if combined_income > 34000:
-        ss_taxable_percent = 0.85
-    elif combined_income > 25000:
-        ss_taxable_percent = 0.50
-    else:
-        ss_taxable_percent = 0
+    ss_taxable_percent = SS_TAXABLE_PERCENTAGES[
+        np.searchsorted(SS_TAXABILITY_THRESHOLDS, combined_income, side='left')]
     taxable_ss = ss_income * ss_taxable_percent
     total_taxable_income = total_withdrawals + pension_income + taxable_ss
     standard_deduction = get_standard_deduction(age)
@@ -97,18 +144,70 @@ def calculate_taxes(withdrawal_401k: float, withdrawal_trad_ira: float,
     federal_tax = adjusted_gross_income * federal
     state_tax = adjusted_gross_income * state
     total_tax = federal_tax + state_tax + taxable_gains
+    gross_income = total_withdrawals + withdrawal_taxable + pension_income + ss_income
     return {
         'standard_deduction': standard_deduction,
         'adjusted_gross_income': adjusted_gross_income,
         'total_tax': total_tax,
         'capital_gains_tax': taxable_gains,
-        'effective_rate': total_tax / (total_withdrawals + withdrawal_taxable + pension_income + ss_income) if (total_withdrawals + withdrawal_taxable + pension_income + ss_income) > 0 else 0
+        'effective_rate': total_tax / gross_income if gross_income > 0 else 0
     }
 
-def calculate_needed_withdrawal(annual_expenses: float, pension_annual: float, 
+def _ss_taxable_pct(combined_income: float) -> float:
+    return float(SS_TAXABLE_PERCENTAGES[
+        np.searchsorted(SS_TAXABILITY_THRESHOLDS, combined_income, side='left')])
+
+def _solve_gross_withdrawal(gap: float, pension_annual: float, ss_annual: float,
+                            age: int, federal: float, state: float) -> float:
+    """Solve W = gap + tax(W) directly.
+
+    With the 60/20/20 account split, tax is affine in W on each segment of the
+    SS-taxability and standard-deduction piecewise structure: tax = a*W + b
+    with a = 0.8*(fed+state) + 0.015 and b = (pension + ss*pct - sd)*(fed+state).
+    Try each segment's closed-form root and keep the one that lands on its own
+    segment; returns -1.0 if none does (caller falls back to iteration).
+    """
+    sd = get_standard_deduction(age)
+    rate = federal + state
+    base_combined = pension_annual + 0.5 * ss_annual
+    # The map W -> gap + tax(W) jumps at the SS thresholds and can have a
+    # fixed point on more than one segment; the iteration this replaces walks
+    # up from gap and lands on the smallest. Any taxed fixed point sits at or
+    # above the deduction-swallowed one, so test that candidate first.
+    withdrawal = gap / (1 - 0.015)
+    if withdrawal > 0:
+        combined = 0.9 * withdrawal + base_combined
+        pct = _ss_taxable_pct(combined)
+        if 0.8 * withdrawal + pension_annual + ss_annual * pct <= sd:
+            return withdrawal
+    a = 0.8 * rate + 0.015
+    for pct in (0.0, 0.5, 0.85):
+        b = (pension_annual + ss_annual * pct - sd) * rate
+        withdrawal = (gap + b) / (1 - a)
+        if withdrawal > 0:
+            combined = 0.9 * withdrawal + base_combined
+            taxable = 0.8 * withdrawal + pension_annual + ss_annual * pct
+            if pct == _ss_taxable_pct(combined) and taxable > sd:
+                return withdrawal
+    return -1.0
+
+def calculate_needed_withdrawal(annual_expenses: float, pension_annual: float,
                                ss_annual: float, age: int, federal_rate: float,
                                state_rate: float, include_medicare: bool,
                                total_balance: float) -> Tuple[float, float, float]:
+    # Same quantize-and-memoize arrangement as calculate_taxes: adjacent
+    # schedule years and reruns land in the same buckets far more often than
+    # they produce distinct solves
+    return _needed_withdrawal_cached(
+        round(annual_expenses / 10) * 10, round(pension_annual / 10) * 10,
+        round(ss_annual / 10) * 10, age, federal_rate, state_rate,
+        include_medicare, round(total_balance / 1000) * 1000)
+
+@lru_cache(maxsize=1024)
+def _needed_withdrawal_cached(annual_expenses: float, pension_annual: float,
+                             ss_annual: float, age: int, federal_rate: float,
+                             state_rate: float, include_medicare: bool,
+                             total_balance: float) -> Tuple[float, float, float]:
     medicare_costs = 0
     if include_medicare and age >= 65:
         estimated_gross = pension_annual + ss_annual + annual_expenses
@@ -128,28 +227,40 @@ def calculate_needed_withdrawal(annual_expenses: float, pension_annual: float,
                 pension_annual, ss_annual, age, federal_rate, state_rate)
             return rmd, medicare_costs, taxes['total_tax']
         return 0, medicare_costs, 0
-    estimated_withdrawal = gap
-    for iteration in range(10):
-        withdrawal_401k = estimated_withdrawal * 0.6
-        withdrawal_trad_ira = estimated_withdrawal * 0.2
-        withdrawal_taxable = estimated_withdrawal * 0.2
-        taxes = calculate_taxes(withdrawal_401k, withdrawal_trad_ira, withdrawal_taxable,
-            pension_annual, ss_annual, age, federal_rate, state_rate)
-        total_need = gap + taxes['total_tax']
-        if abs(total_need - estimated_withdrawal) < 50:
-            break
-        estimated_withdrawal = total_need
+    taxes = None
+    estimated_withdrawal = _solve_gross_withdrawal(
+        gap, pension_annual, ss_annual, age, federal_rate / 100, state_rate / 100)
+    if estimated_withdrawal < 0:
+        # No segment claimed the root (only possible right at a boundary);
+        # fall back to the original fixed-point iteration
+        estimated_withdrawal = gap
+        for iteration in range(10):
+            withdrawal_401k = estimated_withdrawal * 0.6
+            withdrawal_trad_ira = estimated_withdrawal * 0.2
+            withdrawal_taxable = estimated_withdrawal * 0.2
+            taxes = calculate_taxes(withdrawal_401k, withdrawal_trad_ira, withdrawal_taxable,
+                pension_annual, ss_annual, age, federal_rate, state_rate)
+            total_need = gap + taxes['total_tax']
+            if abs(total_need - estimated_withdrawal) < 50:
+                break
+            estimated_withdrawal = total_need
+            # If the loop runs out of iterations, this pricing is one
+            # estimate behind; force the recompute below
+            taxes = None
     rmd = calculate_rmd(total_balance, age)
     final_withdrawal = max(estimated_withdrawal, rmd)
-    withdrawal_401k = final_withdrawal * 0.6
-    withdrawal_trad_ira = final_withdrawal * 0.2
-    withdrawal_taxable = final_withdrawal * 0.2
-    final_taxes = calculate_taxes(withdrawal_401k, withdrawal_trad_ira, withdrawal_taxable,
-        pension_annual, ss_annual, age, federal_rate, state_rate)
+    if taxes is None or final_withdrawal != estimated_withdrawal:
+        # Only recompute when the RMD floor moved the withdrawal (or the
+        # closed-form path never priced it)
+        withdrawal_401k = final_withdrawal * 0.6
+        withdrawal_trad_ira = final_withdrawal * 0.2
+        withdrawal_taxable = final_withdrawal * 0.2
+        taxes = calculate_taxes(withdrawal_401k, withdrawal_trad_ira, withdrawal_taxable,
+            pension_annual, ss_annual, age, federal_rate, state_rate)
     if include_medicare and age >= 65:
         actual_gross = final_withdrawal + pension_annual + ss_annual
         medicare_costs = calculate_medicare_costs(age, actual_gross)
-    return final_withdrawal, medicare_costs, final_taxes['total_tax']
+    return final_withdrawal, medicare_costs, taxes['total_tax']
 
 def calculate_retirement_expenses(current_monthly_expenses: float, retirement_age: int, 
                                  current_age: int, expense_percentage: float, 
@@ -167,167 +278,235 @@ def calculate_home_value(current_value: float, years: int, appreciation_rate: fl
     future_value = current_value * ((1 + annual_rate) ** years)
     return future_value
 
+@st.cache_data(max_entries=64, show_spinner=False)
 def generate_amortization_schedule(starting_401k: float, starting_trad_ira: float,
                                   starting_roth_ira: float, starting_taxable: float,
                                   return_rate: float, pension_income: float, ss_income: float,
                                   retirement_age: int, federal_rate: float,
                                   state_rate: float, inflation_rate: float,
                                   include_medicare: bool, monthly_expenses: float,
-                                  years: int = 18) -> List[Dict]:
-    schedule = []
+                                  years: int = 18) -> Dict[str, np.ndarray]:
     balance_401k = starting_401k
     balance_trad_ira = starting_trad_ira
     balance_roth_ira = starting_roth_ira
     balance_taxable = starting_taxable
     annual_return = return_rate / 100
+    one_plus_return = 1 + annual_return
     inflation = inflation_rate / 100
-    adjusted_pension = pension_income * 12
-    adjusted_ss = ss_income * 12
-    annual_expenses = monthly_expenses * 12
-    
+    base_pension = pension_income * 12
+    base_ss = ss_income * 12
+    base_expenses = monthly_expenses * 12
+
+    # The balance recurrence is inherently sequential, but the inflation series
+    # and ages are not: precompute them and index per year
+    ages = np.arange(retirement_age, retirement_age + years, dtype=np.int16)
+    inflation_factors = np.power(1 + inflation, np.arange(years))
+
+    # One flat array per column, filled in place; building row dicts and
+    # letting pandas re-columnize them later costs far more than this does.
+    # Narrow dtypes on purpose: float32 is plenty for display dollars and
+    # int16 for ages/years, and both halve the Arrow payload to the browser
+    col_names = ('Total Start', 'Total Growth', 'Needed Withdrawal', '4% Would Be',
+                 'Savings vs 4%', 'Pension', 'Social Security', 'Gross Income',
+                 'Taxes', 'Medicare', 'Net Income', 'Annual Expenses',
+                 'Surplus/Shortfall', 'Total End')
+    cols = {name: np.zeros(years, dtype=np.float32) for name in col_names}
+    rmd_flags = np.zeros(years, dtype=bool)
+    rows = 0
+
     for year in range(1, years + 1):
         total_balance = balance_401k + balance_trad_ira + balance_roth_ira + balance_taxable
         if total_balance <= 0:
             break
-        current_age = retirement_age + year - 1
-        total_begin = total_balance
-        growth_401k = balance_401k * annual_return
-        growth_trad_ira = balance_trad_ira * annual_return
-        growth_roth_ira = balance_roth_ira * annual_return
-        growth_taxable = balance_taxable * annual_return
-        total_growth = growth_401k + growth_trad_ira + growth_roth_ira + growth_taxable
+        current_age = int(ages[year - 1])
+        infl_factor = float(inflation_factors[year - 1])
+        adjusted_pension = base_pension * infl_factor
+        adjusted_ss = base_ss * infl_factor
+        annual_expenses = base_expenses * infl_factor
+        # One multiply covers total growth; every account shares the rate
+        total_growth = total_balance * annual_return
         needed_withdrawal, medicare_costs, taxes = calculate_needed_withdrawal(
             annual_expenses, adjusted_pension, adjusted_ss, current_age,
             federal_rate, state_rate, include_medicare, total_balance)
         four_percent_withdrawal = total_balance * 0.04
-        if total_balance > 0:
-            pct_401k = balance_401k / total_balance
-            pct_trad_ira = balance_trad_ira / total_balance
-            pct_roth = balance_roth_ira / total_balance
-            pct_taxable = balance_taxable / total_balance
-            withdrawal_401k = needed_withdrawal * pct_401k
-            withdrawal_trad_ira = needed_withdrawal * pct_trad_ira
-            withdrawal_roth = needed_withdrawal * pct_roth
-            withdrawal_taxable_acct = needed_withdrawal * pct_taxable
+        if needed_withdrawal <= total_balance + total_growth:
+            # Every account grows at the same rate, so a proportional draw
+            # that doesn't overdraw the total can't overdraw any one account:
+            # the per-account caps and floors below can only bind on depletion
+            end_factor = one_plus_return - needed_withdrawal / total_balance
+            end_401k = balance_401k * end_factor
+            end_trad_ira = balance_trad_ira * end_factor
+            end_roth_ira = balance_roth_ira * end_factor
+            end_taxable = balance_taxable * end_factor
+            total_withdrawal = needed_withdrawal
         else:
-            withdrawal_401k = withdrawal_trad_ira = withdrawal_roth = withdrawal_taxable_acct = 0
-        withdrawal_401k = min(withdrawal_401k, balance_401k + growth_401k)
-        withdrawal_trad_ira = min(withdrawal_trad_ira, balance_trad_ira + growth_trad_ira)
-        withdrawal_roth = min(withdrawal_roth, balance_roth_ira + growth_roth_ira)
-        withdrawal_taxable_acct = min(withdrawal_taxable_acct, balance_taxable + growth_taxable)
-        total_withdrawal = withdrawal_401k + withdrawal_trad_ira + withdrawal_roth + withdrawal_taxable_acct
-        end_401k = max(0, balance_401k + growth_401k - withdrawal_401k)
-        end_trad_ira = max(0, balance_trad_ira + growth_trad_ira - withdrawal_trad_ira)
-        end_roth_ira = max(0, balance_roth_ira + growth_roth_ira - withdrawal_roth)
-        end_taxable = max(0, balance_taxable + growth_taxable - withdrawal_taxable_acct)
+            # Grown balances serve both the clamp and the end-of-year value
+            grown_401k = balance_401k * one_plus_return
+            grown_trad_ira = balance_trad_ira * one_plus_return
+            grown_roth_ira = balance_roth_ira * one_plus_return
+            grown_taxable = balance_taxable * one_plus_return
+            withdrawal_401k = min(needed_withdrawal * balance_401k / total_balance, grown_401k)
+            withdrawal_trad_ira = min(needed_withdrawal * balance_trad_ira / total_balance, grown_trad_ira)
+            withdrawal_roth = min(needed_withdrawal * balance_roth_ira / total_balance, grown_roth_ira)
+            withdrawal_taxable_acct = min(needed_withdrawal * balance_taxable / total_balance, grown_taxable)
+            total_withdrawal = withdrawal_401k + withdrawal_trad_ira + withdrawal_roth + withdrawal_taxable_acct
+            end_401k = max(0, grown_401k - withdrawal_401k)
+            end_trad_ira = max(0, grown_trad_ira - withdrawal_trad_ira)
+            end_roth_ira = max(0, grown_roth_ira - withdrawal_roth)
+            end_taxable = max(0, grown_taxable - withdrawal_taxable_acct)
         total_end = end_401k + end_trad_ira + end_roth_ira + end_taxable
         gross_income = total_withdrawal + adjusted_pension + adjusted_ss
         net_income = gross_income - taxes - medicare_costs
         surplus_shortfall = net_income - annual_expenses
-        rmd_required = calculate_rmd(total_balance, current_age)
-        savings_vs_4pct = four_percent_withdrawal - needed_withdrawal
-        schedule.append({
-            'Year': year,
-            'Age': current_age,
-            'Total Start': total_begin,
-            'Total Growth': total_growth,
-            'Needed Withdrawal': needed_withdrawal,
-            '4% Would Be': four_percent_withdrawal,
-            'Savings vs 4%': savings_vs_4pct,
-            'RMD Required': 'Yes' if rmd_required > 0 else 'No',
-            'Pension': adjusted_pension,
-            'Social Security': adjusted_ss,
-            'Gross Income': gross_income,
-            'Taxes': taxes,
-            'Medicare': medicare_costs,
-            'Net Income': net_income,
-            'Annual Expenses': annual_expenses,
-            'Surplus/Shortfall': surplus_shortfall,
-            'Total End': total_end
-        })
+        i = year - 1
+        cols['Total Start'][i] = total_balance
+        cols['Total Growth'][i] = total_growth
+        cols['Needed Withdrawal'][i] = needed_withdrawal
+        cols['4% Would Be'][i] = four_percent_withdrawal
+        rmd_flags[i] = calculate_rmd(total_balance, current_age) > 0
+        cols['Pension'][i] = adjusted_pension
+        cols['Social Security'][i] = adjusted_ss
+        cols['Gross Income'][i] = gross_income
+        cols['Taxes'][i] = taxes
+        cols['Medicare'][i] = medicare_costs
+        cols['Net Income'][i] = net_income
+        cols['Annual Expenses'][i] = annual_expenses
+        cols['Surplus/Shortfall'][i] = surplus_shortfall
+        cols['Total End'][i] = total_end
+        rows = year
         balance_401k = end_401k
         balance_trad_ira = end_trad_ira
         balance_roth_ira = end_roth_ira
         balance_taxable = end_taxable
-        adjusted_pension *= (1 + inflation)
-        adjusted_ss *= (1 + inflation)
-        annual_expenses *= (1 + inflation)
+    if rows == 0:
+        return {}
+    # Derived column, one vector subtraction instead of a per-year store
+    cols['Savings vs 4%'] = cols['4% Would Be'] - cols['Needed Withdrawal']
+    schedule = {'Year': np.arange(1, rows + 1, dtype=np.int16), 'Age': ages[:rows]}
+    for name in col_names:
+        schedule[name] = cols[name][:rows]
+        if name == 'Savings vs 4%':
+            schedule['RMD Required'] = rmd_flags[:rows]
     return schedule
 
-def calculate_projection(current_age: int, current_401k: float, annual_401k_contribution: float,
-                        current_trad_ira: float, annual_trad_ira_contribution: float,
-                        current_roth_ira: float, annual_roth_ira_contribution: float,
-                        current_taxable: float, annual_taxable_contribution: float,
-                        return_rate: float, pension_full: float, ss_full: float,
-                        full_retirement_age: int, federal_tax: float, state_tax: float,
-                        inflation_rate: float, include_medicare: bool,
-                        current_monthly_expenses: float, retirement_expense_pct: float,
-                        current_home_value: float, retirement_age: int) -> Dict:
-    years_until_retirement = retirement_age - current_age
-    if years_until_retirement <= 0:
-        return None
-    projected_401k = calculate_account_growth(current_401k, years_until_retirement, annual_401k_contribution, return_rate)
-    projected_trad_ira = calculate_account_growth(current_trad_ira, years_until_retirement, annual_trad_ira_contribution, return_rate)
-    projected_roth_ira = calculate_account_growth(current_roth_ira, years_until_retirement, annual_roth_ira_contribution, return_rate)
-    projected_taxable = calculate_account_growth(current_taxable, years_until_retirement, annual_taxable_contribution, return_rate)
-    projected_home_value = calculate_home_value(current_home_value, years_until_retirement, inflation_rate)
-    monthly_retirement_expenses = calculate_retirement_expenses(
-        current_monthly_expenses, retirement_age, current_age, retirement_expense_pct, inflation_rate)
+def _grow(balance: float, contribution: float, growth_factor: np.ndarray,
+          annuity_factor: np.ndarray) -> np.ndarray:
+    return balance * growth_factor + contribution * annuity_factor
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _project_balances(current_age: int, current_401k: float, annual_401k_contribution: float,
+                     current_trad_ira: float, annual_trad_ira_contribution: float,
+                     current_roth_ira: float, annual_roth_ira_contribution: float,
+                     current_taxable: float, annual_taxable_contribution: float,
+                     return_rate: float, inflation_rate: float, current_home_value: float,
+                     retirement_ages: Tuple[int, ...]) -> Tuple[np.ndarray, ...]:
+    # Cached separately from the full sweep: keyed only on growth inputs, so a
+    # tax-side tweak (rates, Medicare toggle, expenses) reuses these balances
+    ages = np.array(retirement_ages)
+    ages = ages[ages > current_age]
+    years = ages - current_age
+    annual_rate = return_rate / 100
+    growth = np.power(1 + annual_rate, years)
+    annuity = (growth - 1) / annual_rate if annual_rate else years.astype(float)
+    projected_401k = _grow(current_401k, annual_401k_contribution, growth, annuity)
+    projected_trad_ira = _grow(current_trad_ira, annual_trad_ira_contribution, growth, annuity)
+    projected_roth_ira = _grow(current_roth_ira, annual_roth_ira_contribution, growth, annuity)
+    projected_taxable = _grow(current_taxable, annual_taxable_contribution, growth, annuity)
+    if current_home_value == 0:
+        # calculate_home_value has the same shortcut; skip the pow entirely
+        projected_home_value = np.zeros_like(growth)
+    else:
+        projected_home_value = current_home_value * np.power(1 + inflation_rate / 100, years)
+    return (ages, years, projected_401k, projected_trad_ira, projected_roth_ira,
+            projected_taxable, projected_home_value)
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def calculate_projections(current_age: int, current_401k: float, annual_401k_contribution: float,
+                         current_trad_ira: float, annual_trad_ira_contribution: float,
+                         current_roth_ira: float, annual_roth_ira_contribution: float,
+                         current_taxable: float, annual_taxable_contribution: float,
+                         return_rate: float, pension_full: float, ss_full: float,
+                         full_retirement_age: int, federal_tax: float, state_tax: float,
+                         inflation_rate: float, include_medicare: bool,
+                         current_monthly_expenses: float, retirement_expense_pct: float,
+                         current_home_value: float,
+                         retirement_ages: Tuple[int, ...] = (62, 65, 67, 70)) -> List[Projection]:
+    (ages, years, projected_401k, projected_trad_ira, projected_roth_ira,
+     projected_taxable, projected_home_value) = _project_balances(
+        current_age, current_401k, annual_401k_contribution,
+        current_trad_ira, annual_trad_ira_contribution,
+        current_roth_ira, annual_roth_ira_contribution,
+        current_taxable, annual_taxable_contribution,
+        return_rate, inflation_rate, current_home_value, retirement_ages)
+    if ages.size == 0:
+        return []
     total_retirement_assets = projected_401k + projected_trad_ira + projected_roth_ira + projected_taxable
     total_net_worth = total_retirement_assets + projected_home_value
-    ss_multiplier = get_social_security_multiplier(retirement_age, full_retirement_age)
-    pension_multiplier = get_pension_multiplier(retirement_age)
-    adjusted_ss = ss_full * ss_multiplier
-    adjusted_pension = pension_full * pension_multiplier
-    annual_expenses = monthly_retirement_expenses * 12
-    needed_withdrawal, medicare_costs, taxes = calculate_needed_withdrawal(
-        annual_expenses, adjusted_pension * 12, adjusted_ss * 12,
-        retirement_age, federal_tax, state_tax, include_medicare, total_retirement_assets)
-    four_percent_withdrawal = total_retirement_assets * 0.04
-    savings_vs_4pct = four_percent_withdrawal - needed_withdrawal
-    total_annual_income = needed_withdrawal + (adjusted_pension * 12) + (adjusted_ss * 12)
-    net_annual_income = total_annual_income - taxes - medicare_costs
-    net_monthly_income = net_annual_income / 12
-    expense_coverage_ratio = (net_annual_income / annual_expenses * 100) if annual_expenses > 0 else 0
-    monthly_surplus_shortfall = net_monthly_income - monthly_retirement_expenses
-    target_age = 80
-    years_to_project = min(target_age - retirement_age, 30)
-    amortization = generate_amortization_schedule(
-        projected_401k, projected_trad_ira, projected_roth_ira, projected_taxable,
-        return_rate, adjusted_pension, adjusted_ss,
-        retirement_age, federal_tax, state_tax, inflation_rate,
-        include_medicare, monthly_retirement_expenses, years_to_project)
-    return {
-        'age': retirement_age,
-        'projected_401k': projected_401k,
-        'projected_trad_ira': projected_trad_ira,
-        'projected_roth_ira': projected_roth_ira,
-        'projected_taxable': projected_taxable,
-        'total_retirement_assets': total_retirement_assets,
-        'projected_home_value': projected_home_value,
-        'total_net_worth': total_net_worth,
-        'pension': adjusted_pension,
-        'pension_multiplier': pension_multiplier,
-        'social_security': adjusted_ss,
-        'ss_multiplier': ss_multiplier,
-        'needed_withdrawal': needed_withdrawal,
-        'four_percent_withdrawal': four_percent_withdrawal,
-        'savings_vs_4pct': savings_vs_4pct,
-        'total_annual_income': total_annual_income,
-        'taxes': taxes,
-        'medicare_costs': medicare_costs,
-        'net_annual_income': net_annual_income,
-        'net_monthly_income': net_monthly_income,
-        'monthly_retirement_expenses': monthly_retirement_expenses,
-        'annual_expenses': annual_expenses,
-        'expense_coverage_ratio': expense_coverage_ratio,
-        'monthly_surplus_shortfall': monthly_surplus_shortfall,
-        'years_until_retirement': years_until_retirement,
-        'amortization': amortization
-    }
+    ss_multipliers = get_social_security_multipliers(ages, full_retirement_age)
+    pension_multipliers = get_pension_multipliers(ages)
+    projections = []
+    for i, retirement_age in enumerate(int(a) for a in ages):
+        years_until_retirement = int(years[i])
+        monthly_retirement_expenses = calculate_retirement_expenses(
+            current_monthly_expenses, retirement_age, current_age, retirement_expense_pct, inflation_rate)
+        adjusted_ss = ss_full * float(ss_multipliers[i])
+        adjusted_pension = pension_full * float(pension_multipliers[i])
+        annual_expenses = monthly_retirement_expenses * 12
+        needed_withdrawal, medicare_costs, taxes = calculate_needed_withdrawal(
+            annual_expenses, adjusted_pension * 12, adjusted_ss * 12,
+            retirement_age, federal_tax, state_tax, include_medicare, float(total_retirement_assets[i]))
+        four_percent_withdrawal = float(total_retirement_assets[i]) * 0.04
+        savings_vs_4pct = four_percent_withdrawal - needed_withdrawal
+        total_annual_income = needed_withdrawal + (adjusted_pension * 12) + (adjusted_ss * 12)
+        net_annual_income = total_annual_income - taxes - medicare_costs
+        net_monthly_income = net_annual_income / 12
+        expense_coverage_ratio = (net_annual_income / annual_expenses * 100) if annual_expenses > 0 else 0
+        monthly_surplus_shortfall = net_monthly_income - monthly_retirement_expenses
+        projections.append(Projection(
+            age=retirement_age,
+            projected_401k=float(projected_401k[i]),
+            projected_trad_ira=float(projected_trad_ira[i]),
+            projected_roth_ira=float(projected_roth_ira[i]),
+            projected_taxable=float(projected_taxable[i]),
+            total_retirement_assets=float(total_retirement_assets[i]),
+            projected_home_value=float(projected_home_value[i]),
+            total_net_worth=float(total_net_worth[i]),
+            pension=adjusted_pension,
+            pension_multiplier=float(pension_multipliers[i]),
+            social_security=adjusted_ss,
+            ss_multiplier=float(ss_multipliers[i]),
+            needed_withdrawal=needed_withdrawal,
+            four_percent_withdrawal=four_percent_withdrawal,
+            savings_vs_4pct=savings_vs_4pct,
+            total_annual_income=total_annual_income,
+            taxes=taxes,
+            medicare_costs=medicare_costs,
+            net_annual_income=net_annual_income,
+            net_monthly_income=net_monthly_income,
+            monthly_retirement_expenses=monthly_retirement_expenses,
+            annual_expenses=annual_expenses,
+            expense_coverage_ratio=expense_coverage_ratio,
+            monthly_surplus_shortfall=monthly_surplus_shortfall,
+            years_until_retirement=years_until_retirement,
+            annual_pension=adjusted_pension * 12,
+            annual_ss=adjusted_ss * 12,
+            lifetime_savings_vs_4pct=savings_vs_4pct * max(0, 80 - retirement_age)
+        ))
+    return projections
+
+@lru_cache(maxsize=4096)
+def _format_whole_dollars(dollars: int) -> str:
+    return f"${dollars:,}"
 
 def format_currency(amount: float) -> str:
-    return f"${amount:,.0f}"
+    # Rendered values repeat heavily ($0, recurring cashflows); cache on the
+    # whole-dollar amount they round to
+    return _format_whole_dollars(round(amount))
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _amortization_csv(amort_df) -> str:
+    # The download button wants the CSV text on every rerun; serialize once
+    return amort_df.to_csv(index=False)
 
 def reset_inputs():
     st.session_state.current_age = 35
@@ -355,12 +534,76 @@ def initialize_defaults():
     if 'current_age' not in st.session_state:
         reset_inputs()
 
-def main():
-    st.set_page_config(page_title="Retirement Calculator", page_icon="💰", layout="wide")
-    initialize_defaults()
-    
-    # Custom CSS for visual appeal
-    st.markdown("""
+# Card HTML, parsed once at import; render sites fill in the numbers
+_SNAPSHOT_ROW_TEMPLATE = """
+    <div class="metric-row">
+        <div class="big-metric">
+            <div class="metric-label">💼 Retirement Savings</div>
+            <div class="metric-value">{retirement}</div>
+        </div>
+        <div class="big-metric">
+            <div class="metric-label">🏠 Home Value</div>
+            <div class="metric-value">{home}</div>
+        </div>
+        <div class="big-metric">
+            <div class="metric-label">💎 Total Net Worth</div>
+            <div class="metric-value">{net_worth}</div>
+        </div>
+    </div>
+    """
+
+_COMPARISON_CARD_TEMPLATE = """
+            <div class="{card_class}">
+                <h2 style="margin:0;">Age {age}</h2>
+                <div style="font-size: 1.5rem; margin: 10px 0;">{assets}</div>
+                <div style="font-size: 0.9rem;">Coverage: {coverage:.0f}%</div>
+                <div style="font-size: 0.9rem;">Save: {savings}/yr</div>
+            </div>
+            """
+
+_INFO_CARD_TEMPLATE = """
+        <div class="{card_class}">
+            <div style="font-size: 0.9rem;">{label}</div>
+            <div style="font-size: 2rem; font-weight: bold;">{value}</div>
+            <div style="font-size: 0.8rem;">{caption}</div>
+        </div>
+        """
+
+# Static markdown for the per-tab expanders; parsed once at import and
+# filled with pre-formatted strings per render
+_BREAKDOWN_TEMPLATE = """
+        **Income Sources:**
+        - Withdrawal from Savings: {needed}/year
+        - Pension: {pension}/year
+        - Social Security: {ss}/year
+        - **Gross Income:** {gross}/year
+        
+        **Deductions:**
+        - Taxes: {taxes}/year
+        - Medicare: {medicare}/year
+        - **Net Income:** {net}/year
+        
+        **Expenses:**
+        - Living Expenses: {expenses}/year
+        
+        **Result:**
+        - Surplus/Shortfall: {surplus}/year
+        """
+
+_WHY_TEMPLATE = """
+        **4% Rule (Traditional):**
+        - Withdraws: {four_pct}/year (regardless of need)
+        
+        **Needs-Based (This Calculator):**
+        - Withdraws: {needed}/year (only what you need)
+        
+        **Annual Savings:** {savings} ✅
+        
+        **Through age 80 ({horizon} years):** {lifetime} preserved! 🎉
+        """
+
+# Page CSS, interned once at import rather than rebuilt per rerun
+_CSS = """
     <style>
     .big-metric {
         background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
@@ -369,6 +612,11 @@ def main():
         color: white;
         text-align: center;
         margin: 10px 0;
+        flex: 1;
+    }
+    .metric-row {
+        display: flex;
+        gap: 20px;
     }
     .metric-value {
         font-size: 2.5rem;
@@ -401,7 +649,130 @@ def main():
         margin: 10px 0;
     }
     </style>
-    """, unsafe_allow_html=True)
+"""
+
+# Year-by-year display slice and its currency format spec, built once
+_DISPLAY_COLS = ['Year', 'Age', 'Total Start', 'Needed Withdrawal',
+                 '4% Would Be', 'Savings vs 4%', 'Total End']
+_MONEY_FORMATS = {col: '${:,.0f}' for col in _DISPLAY_COLS[2:]}
+
+def _render_metric_row(items) -> None:
+    # items: (label, value) or (label, value, delta) tuples, one column each
+    for col, item in zip(st.columns(len(items)), items):
+        with col:
+            st.metric(*item)
+
+@st.fragment
+def render_projection_tab(proj: Projection, return_rate: float, federal_tax: float,
+                          state_tax: float, inflation_rate: float,
+                          include_medicare: bool) -> None:
+    # Fragment: widget interactions inside a tab (expanders, download button)
+    # rerun only this function instead of the whole script
+    # Amounts that appear in more than one card/expander, formatted once
+    needed_str = format_currency(proj.needed_withdrawal)
+    four_pct_str = format_currency(proj.four_percent_withdrawal)
+    savings_str = format_currency(proj.savings_vs_4pct)
+
+    # KEY METRICS - BIG AND VISUAL
+    col1, col2, col3 = st.columns(3)
+    
+    covered = proj.expense_coverage_ratio >= 100
+    with col1:
+        st.markdown(_INFO_CARD_TEMPLATE.format(
+            card_class="info-card", label="💰 Annual Withdrawal Needed",
+            value=needed_str, caption=f"vs 4% rule: {four_pct_str}"),
+            unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown(_INFO_CARD_TEMPLATE.format(
+            card_class="info-card", label="💵 Monthly Income",
+            value=format_currency(proj.net_monthly_income),
+            caption=f"vs expenses: {format_currency(proj.monthly_retirement_expenses)}"),
+            unsafe_allow_html=True)
+    
+    with col3:
+        st.markdown(_INFO_CARD_TEMPLATE.format(
+            card_class="success-card" if covered else "warning-card",
+            label="✅ Coverage Ratio",
+            value=f"{proj.expense_coverage_ratio:.0f}%",
+            caption="Covered!" if covered else "Review plan"),
+            unsafe_allow_html=True)
+    
+    # EXPANDABLE DETAILS
+    with st.expander("💼 📊 Show Asset Breakdown"):
+        _render_metric_row([
+            ("401(k)", format_currency(proj.projected_401k)),
+            ("Trad IRA", format_currency(proj.projected_trad_ira)),
+            ("Roth IRA", format_currency(proj.projected_roth_ira)),
+            ("Taxable", format_currency(proj.projected_taxable)),
+            ("TOTAL", format_currency(proj.total_retirement_assets))])
+    
+    with st.expander("💰 Show Income & Expense Breakdown"):
+        st.markdown(_BREAKDOWN_TEMPLATE.format(
+            needed=needed_str,
+            pension=format_currency(proj.annual_pension),
+            ss=format_currency(proj.annual_ss),
+            gross=format_currency(proj.total_annual_income),
+            taxes=format_currency(proj.taxes),
+            medicare=format_currency(proj.medicare_costs),
+            net=format_currency(proj.net_annual_income),
+            expenses=format_currency(proj.annual_expenses),
+            surplus=format_currency(proj.monthly_surplus_shortfall * 12)))
+    
+    with st.expander("💡 Why Needs-Based is Better"):
+        st.markdown(_WHY_TEMPLATE.format(
+            four_pct=four_pct_str,
+            needed=needed_str,
+            savings=savings_str,
+            horizon=max(0, 80 - proj.age),
+            lifetime=format_currency(proj.lifetime_savings_vs_4pct)))
+    
+    # Year-by-year table, built on demand so the comparison view never pays
+    # for it; generate_amortization_schedule is cached, so revisits are free
+    import pandas as pd
+    years_to_project = min(80 - proj.age, 30)
+    schedule = generate_amortization_schedule(
+        proj.projected_401k, proj.projected_trad_ira, proj.projected_roth_ira,
+        proj.projected_taxable, return_rate, proj.pension, proj.social_security,
+        proj.age, federal_tax, state_tax, inflation_rate, include_medicare,
+        proj.monthly_retirement_expenses, years_to_project)
+    if schedule:
+        st.subheader(f"📅 Year-by-Year Schedule (Age {proj.age} to 80)")
+
+        # Summary metrics straight off the column arrays, no Series machinery
+        total_needed = float(schedule['Needed Withdrawal'].sum())
+        total_4pct = float(schedule['4% Would Be'].sum())
+        total_savings = total_4pct - total_needed
+        
+        _render_metric_row([
+            ("Total Withdrawn (Needs)", format_currency(total_needed)),
+            ("4% Rule Would Be", format_currency(total_4pct)),
+            ("Total Savings", format_currency(total_savings), "vs 4% rule")])
+        
+        # Show table button
+        with st.expander("📋 Show Full Year-by-Year Table"):
+            # The summary metrics above read the raw arrays; only the styled
+            # table and the CSV need a DataFrame
+            amort_df = pd.DataFrame(schedule)
+            display_styler = amort_df[_DISPLAY_COLS].style.format(_MONEY_FORMATS)
+            # Static render: st.table ships plain HTML instead of the
+            # interactive grid component, which is overkill for 30 rows
+            st.table(display_styler.hide(axis='index'))
+            
+            csv = _amortization_csv(amort_df)
+            st.download_button(
+                label="📥 Download CSV",
+                data=csv,
+                file_name=f"retirement_age_{proj.age}.csv",
+                mime="text/csv"
+            )
+
+def main():
+    st.set_page_config(page_title="Retirement Calculator", page_icon="💰", layout="wide")
+    initialize_defaults()
+    
+    # Custom CSS for visual appeal
+    st.markdown(_CSS, unsafe_allow_html=True)
     
     st.title("💰 Comprehensive US Retirement Calculator")
     st.caption("Smart withdrawal strategy - Calculate what you actually need, not arbitrary 4% rule")
@@ -479,63 +850,34 @@ def main():
     current_total_retirement = current_401k + current_trad_ira + current_roth_ira + current_taxable
     current_total_net_worth = current_total_retirement + current_home_value
     
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.markdown(f"""
-        <div class="big-metric">
-            <div class="metric-label">💼 Retirement Savings</div>
-            <div class="metric-value">{format_currency(current_total_retirement)}</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown(f"""
-        <div class="big-metric">
-            <div class="metric-label">🏠 Home Value</div>
-            <div class="metric-value">{format_currency(current_home_value)}</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col3:
-        st.markdown(f"""
-        <div class="big-metric">
-            <div class="metric-label">💎 Total Net Worth</div>
-            <div class="metric-value">{format_currency(current_total_net_worth)}</div>
-        </div>
-        """, unsafe_allow_html=True)
+    # One element (and one frontend delta) for the whole card row, laid out
+    # by the flexbox rules in _CSS instead of st.columns
+    st.markdown(_SNAPSHOT_ROW_TEMPLATE.format(
+        retirement=format_currency(current_total_retirement),
+        home=format_currency(current_home_value),
+        net_worth=format_currency(current_total_net_worth)), unsafe_allow_html=True)
     
     # Details button
     with st.expander("📋 Show Account Details"):
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.metric("401(k)", format_currency(current_401k))
-        with col2:
-            st.metric("Traditional IRA", format_currency(current_trad_ira))
-        with col3:
-            st.metric("Roth IRA", format_currency(current_roth_ira))
-        with col4:
-            st.metric("Taxable", format_currency(current_taxable))
+        _render_metric_row([
+            ("401(k)", format_currency(current_401k)),
+            ("Traditional IRA", format_currency(current_trad_ira)),
+            ("Roth IRA", format_currency(current_roth_ira)),
+            ("Taxable", format_currency(current_taxable))])
     
     st.markdown("---")
     
     # Calculate projections
-    retirement_ages = [62, 65, 67, 70]
-    projections = []
-    
-    for age in retirement_ages:
-        if age > current_age:
-            proj = calculate_projection(
-                current_age, current_401k, annual_401k_contribution,
-                current_trad_ira, annual_trad_ira_contribution,
-                current_roth_ira, annual_roth_ira_contribution,
-                current_taxable, annual_taxable_contribution,
-                return_rate, pension_full, ss_full, 
-                full_retirement_age, federal_tax, state_tax,
-                inflation_rate, include_medicare,
-                current_monthly_expenses, retirement_expense_pct,
-                current_home_value, age)
-            if proj:
-                projections.append(proj)
+    projections = calculate_projections(
+        current_age, current_401k, annual_401k_contribution,
+        current_trad_ira, annual_trad_ira_contribution,
+        current_roth_ira, annual_roth_ira_contribution,
+        current_taxable, annual_taxable_contribution,
+        return_rate, pension_full, ss_full,
+        full_retirement_age, federal_tax, state_tax,
+        inflation_rate, include_medicare,
+        current_monthly_expenses, retirement_expense_pct,
+        current_home_value)
     
     # Quick comparison
     st.header("🎯 Quick Retirement Age Comparison")
@@ -543,152 +885,44 @@ def main():
     cols = st.columns(len(projections))
     for col, proj in zip(cols, projections):
         with col:
-            coverage_color = "success-card" if proj['expense_coverage_ratio'] >= 100 else "warning-card"
-            st.markdown(f"""
-            <div class="{coverage_color}">
-                <h2 style="margin:0;">Age {proj['age']}</h2>
-                <div style="font-size: 1.5rem; margin: 10px 0;">{format_currency(proj['total_retirement_assets'])}</div>
-                <div style="font-size: 0.9rem;">Coverage: {proj['expense_coverage_ratio']:.0f}%</div>
-                <div style="font-size: 0.9rem;">Save: {format_currency(proj['savings_vs_4pct'])}/yr</div>
-            </div>
-            """, unsafe_allow_html=True)
+            coverage_color = "success-card" if proj.expense_coverage_ratio >= 100 else "warning-card"
+            st.markdown(_COMPARISON_CARD_TEMPLATE.format(
+                card_class=coverage_color,
+                age=proj.age,
+                assets=format_currency(proj.total_retirement_assets),
+                coverage=proj.expense_coverage_ratio,
+                savings=format_currency(proj.savings_vs_4pct)), unsafe_allow_html=True)
     
     # Show full comparison table button
     with st.expander("📊 Show Detailed Comparison Table"):
-        comparison_data = []
-        for proj in projections:
-            row = {
-                'Retire At': f"Age {proj['age']}",
-                'Assets': format_currency(proj['total_retirement_assets']),
-                'Need': format_currency(proj['needed_withdrawal']),
-                '4% Rule': format_currency(proj['four_percent_withdrawal']),
-                'Save/Year': format_currency(proj['savings_vs_4pct']),
-                'Coverage': f"{proj['expense_coverage_ratio']:.0f}%"
-            }
-            comparison_data.append(row)
-        st.dataframe(pd.DataFrame(comparison_data), use_container_width=True, hide_index=True)
+        # Deferred so a run that never builds a table never imports pandas;
+        # the module cache makes repeat imports free
+        import pandas as pd
+        comparison_df = pd.DataFrame({
+            'Retire At': [f"Age {proj.age}" for proj in projections],
+            'Assets': [proj.total_retirement_assets for proj in projections],
+            'Need': [proj.needed_withdrawal for proj in projections],
+            '4% Rule': [proj.four_percent_withdrawal for proj in projections],
+            'Save/Year': [proj.savings_vs_4pct for proj in projections],
+            'Coverage': [proj.expense_coverage_ratio for proj in projections]
+        })
+        comparison_styler = comparison_df.style.format({
+            'Assets': '${:,.0f}', 'Need': '${:,.0f}', '4% Rule': '${:,.0f}',
+            'Save/Year': '${:,.0f}', 'Coverage': '{:.0f}%'
+        }).hide(axis='index')
+        st.table(comparison_styler)
     
     st.markdown("---")
     
     # Detailed tabs
     st.header("💵 Detailed Retirement Plans")
     
-    tabs = st.tabs([f"📅 Age {proj['age']}" for proj in projections])
-    
+    tabs = st.tabs([f"📅 Age {proj.age}" for proj in projections])
+
     for tab, proj in zip(tabs, projections):
         with tab:
-            # KEY METRICS - BIG AND VISUAL
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                st.markdown(f"""
-                <div class="info-card">
-                    <div style="font-size: 0.9rem;">💰 Annual Withdrawal Needed</div>
-                    <div style="font-size: 2rem; font-weight: bold;">{format_currency(proj['needed_withdrawal'])}</div>
-                    <div style="font-size: 0.8rem;">vs 4% rule: {format_currency(proj['four_percent_withdrawal'])}</div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            with col2:
-                st.markdown(f"""
-                <div class="info-card">
-                    <div style="font-size: 0.9rem;">💵 Monthly Income</div>
-                    <div style="font-size: 2rem; font-weight: bold;">{format_currency(proj['net_monthly_income'])}</div>
-                    <div style="font-size: 0.8rem;">vs expenses: {format_currency(proj['monthly_retirement_expenses'])}</div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            with col3:
-                coverage_card = "success-card" if proj['expense_coverage_ratio'] >= 100 else "warning-card"
-                st.markdown(f"""
-                <div class="{coverage_card}">
-                    <div style="font-size: 0.9rem;">✅ Coverage Ratio</div>
-                    <div style="font-size: 2rem; font-weight: bold;">{proj['expense_coverage_ratio']:.0f}%</div>
-                    <div style="font-size: 0.8rem;">{'Covered!' if proj['expense_coverage_ratio'] >= 100 else 'Review plan'}</div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            # EXPANDABLE DETAILS
-            with st.expander("💼 📊 Show Asset Breakdown"):
-                col1, col2, col3, col4, col5 = st.columns(5)
-                with col1:
-                    st.metric("401(k)", format_currency(proj['projected_401k']))
-                with col2:
-                    st.metric("Trad IRA", format_currency(proj['projected_trad_ira']))
-                with col3:
-                    st.metric("Roth IRA", format_currency(proj['projected_roth_ira']))
-                with col4:
-                    st.metric("Taxable", format_currency(proj['projected_taxable']))
-                with col5:
-                    st.metric("TOTAL", format_currency(proj['total_retirement_assets']))
-            
-            with st.expander("💰 Show Income & Expense Breakdown"):
-                st.markdown(f"""
-                **Income Sources:**
-                - Withdrawal from Savings: {format_currency(proj['needed_withdrawal'])}/year
-                - Pension: {format_currency(proj['pension'] * 12)}/year
-                - Social Security: {format_currency(proj['social_security'] * 12)}/year
-                - **Gross Income:** {format_currency(proj['total_annual_income'])}/year
-                
-                **Deductions:**
-                - Taxes: {format_currency(proj['taxes'])}/year
-                - Medicare: {format_currency(proj['medicare_costs'])}/year
-                - **Net Income:** {format_currency(proj['net_annual_income'])}/year
-                
-                **Expenses:**
-                - Living Expenses: {format_currency(proj['annual_expenses'])}/year
-                
-                **Result:**
-                - Surplus/Shortfall: {format_currency(proj['monthly_surplus_shortfall'] * 12)}/year
-                """)
-            
-            with st.expander("💡 Why Needs-Based is Better"):
-                st.markdown(f"""
-                **4% Rule (Traditional):**
-                - Withdraws: {format_currency(proj['four_percent_withdrawal'])}/year (regardless of need)
-                
-                **Needs-Based (This Calculator):**
-                - Withdraws: {format_currency(proj['needed_withdrawal'])}/year (only what you need)
-                
-                **Annual Savings:** {format_currency(proj['savings_vs_4pct'])} ✅
-                
-                **Over 18 years:** {format_currency(proj['savings_vs_4pct'] * 18)} preserved! 🎉
-                """)
-            
-            # Year-by-year table
-            if proj['amortization']:
-                st.subheader(f"📅 Year-by-Year Schedule (Age {proj['age']} to 80)")
-                
-                amort_df = pd.DataFrame(proj['amortization'])
-                
-                # Summary metrics
-                total_needed = amort_df['Needed Withdrawal'].sum()
-                total_4pct = amort_df['4% Would Be'].sum()
-                total_savings = total_4pct - total_needed
-                
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.metric("Total Withdrawn (Needs)", format_currency(total_needed))
-                with col2:
-                    st.metric("4% Rule Would Be", format_currency(total_4pct))
-                with col3:
-                    st.metric("Total Savings", format_currency(total_savings), delta="vs 4% rule")
-                
-                # Show table button
-                with st.expander("📋 Show Full Year-by-Year Table"):
-                    display_df = amort_df[['Year', 'Age', 'Total Start', 'Needed Withdrawal', 
-                                          '4% Would Be', 'Savings vs 4%', 'Total End']].copy()
-                    for col in ['Total Start', 'Needed Withdrawal', '4% Would Be', 'Savings vs 4%', 'Total End']:
-                        display_df[col] = display_df[col].apply(lambda x: format_currency(x))
-                    st.dataframe(display_df, use_container_width=True, hide_index=True)
-                    
-                    csv = amort_df.to_csv(index=False)
-                    st.download_button(
-                        label="📥 Download CSV",
-                        data=csv,
-                        file_name=f"retirement_age_{proj['age']}.csv",
-                        mime="text/csv"
-                    )
+            render_projection_tab(proj, return_rate, federal_tax, state_tax,
+                                  inflation_rate, include_medicare)
 
 if __name__ == "__main__":
     main()